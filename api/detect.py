@@ -1,88 +1,368 @@
 from http.server import BaseHTTPRequestHandler
+import gzip
 import json
+import threading
+import time
 import traceback
 from urllib.parse import urlparse
 from datetime import datetime
+from functools import cached_property
+from collections import OrderedDict
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from lxml import etree
+try:
+    import ahocorasick
+except ImportError:  # 未安装pyahocorasick时退回单个合并正则
+    ahocorasick = None
+import orjson
 import re
-from typing import Dict, List, Tuple
+from typing import Callable, ClassVar, Dict, Iterator, List, Optional, Tuple
+
+# 检测的应用, 顺序即结果中detected_apps的顺序
+APP_NAMES: Tuple[str, ...] = (
+    'Zepto Product Personalizer',
+    'Bold Product Options',
+    'Kickflip',
+    'Customily',
+    'Shoppad Infinite Options',
+    'Hulk Product Options',
+    'Tepo Product Options',
+    'APO (Advanced Product Options)',
+    'Teeinblue',
+    'Zakeke',
+    'SC Product Options',
+    'LPO (Live Product Options)',
+    'Avis Product Options',
+    'Globo Product Options',
+    'Easify Product Options',
+    'Shopaw Product Options'
+)
+
+# 特征表: (特征字符串, APP_NAMES下标, 分值)
+# 普通的小写特征不区分大小写匹配; JS标识符等区分大小写, 见_PATTERN_EXACT
+# Bold依赖DOM检测, Kickflip的class/id特征依赖正则, 均在对应的detect_*方法中处理
+PATTERNS: Tuple[Tuple[str, int, int], ...] = (
+    # Zepto Product Personalizer
+    ('pplr_custom_cart_track', 0, 30),
+    ('zepto-personalizer-container', 0, 25),
+    ('shopify://apps/zepto-product-personalizer', 0, 30),
+    ('_zepto_design_id', 0, 15),
+    # Kickflip
+    ('data-mczr=', 2, 15),
+    ('#mczr-modal', 2, 15),
+    ('mczrAddToCart', 2, 15),
+    # Customily
+    ('window.engraver', 3, 35),
+    ('engraver.init', 3, 30),
+    ('customily.com', 3, 25),
+    ('preview-canvas', 3, 10),
+    # Shoppad Infinite Options
+    ('Shoppad.apps.infiniteoptions', 4, 40),
+    ('infiniteoptions-container', 4, 30),
+    ('infinite_options', 4, 20),
+    ('window.Shoppad', 4, 10),
+    # Hulk Product Options
+    ('HulkProductOptions', 5, 35),
+    ('hulk-product-options', 5, 30),
+    ('hulkapps.com', 5, 25),
+    ('hulk_po', 5, 10),
+    # Tepo Product Options
+    ('tepo-options', 6, 30),
+    ('TepoOptions', 6, 30),
+    ('class="tepo-', 6, 25),
+    ('window.tepo', 6, 15),
+    # APO (Advanced Product Options)
+    ('mwProductOptionsObjects', 7, 40),
+    ('mw-product-options', 7, 30),
+    ('mageworx', 7, 20),
+    ('_mw_option_relation', 7, 10),
+    # Teeinblue
+    ('Teeinblue', 8, 30),
+    ('teeinblue-form', 8, 30),
+    ('teeinblue.com', 8, 25),
+    ('window.TIB', 8, 15),
+    # Zakeke
+    ('zakekeDesigner', 9, 35),
+    ('zakeke-container', 9, 30),
+    ('zakeke.com', 9, 25),
+    ('zakeke-button', 9, 10),
+    # SC Product Options
+    ('SCProductOptions', 10, 35),
+    ('sc-product-options', 10, 30),
+    ('data-sc-option', 10, 20),
+    # LPO (Live Product Options)
+    ('liveProductOptions', 11, 35),
+    ('lpo-options', 11, 30),
+    ('cloudlift', 11, 25),
+    ('window.LPO', 11, 10),
+    # Avis Product Options
+    ('AvisOptions', 12, 35),
+    ('avis-options', 12, 30),
+    ('avisplus-product-options', 12, 25),
+    ('data-avis-option', 12, 10),
+    # Globo Product Options
+    ('GloboProductOptions', 13, 35),
+    ('globo-options', 13, 30),
+    ('globo.io', 13, 25),
+    ('globosoftware', 13, 15),
+    # Easify Product Options
+    ('EasifyOptions', 14, 35),
+    ('easify-options', 14, 30),
+    ('data-easify', 14, 20),
+    ('easify_product_options', 14, 15),
+    # Shopaw Product Options
+    ('ShopawOptions', 15, 35),
+    ('shopaw-options', 15, 30),
+    ('shopaw-product-builder', 15, 25),
+    ('data-shopaw', 15, 10)
+)
+
+_APP_INDEX = {app_name: i for i, app_name in enumerate(APP_NAMES)}
+
+# PATTERNS按列拆分的并行数组, 扫描热循环中按下标直接取值
+_PATTERN_APPS: Tuple[int, ...] = tuple(app_idx for _, app_idx, _ in PATTERNS)
+_PATTERN_POINTS: Tuple[int, ...] = tuple(points for _, _, points in PATTERNS)
+# JS标识符(含大写字母或以window.开头)区分大小写; 小写后与之互相包含的特征
+# (如teeinblue.com之于Teeinblue)同样区分大小写, 避免同一处文本被两个特征重复计分
+_CASE_SENSITIVE = {pattern.lower() for pattern, _, _ in PATTERNS
+                   if pattern != pattern.lower() or pattern.startswith('window.')}
+# 区分大小写的特征在小写页面上命中后, 还需与原始字节比对; 不区分大小写的为None
+_PATTERN_EXACT: Tuple[Optional[bytes], ...] = tuple(
+    pattern.encode('ascii')
+    if any(key in pattern.lower() or pattern.lower() in key for key in _CASE_SENSITIVE)
+    else None
+    for pattern, _, _ in PATTERNS
+)
+
+# 分段扫描时相邻两段的重叠长度
+_PATTERN_OVERLAP = max(len(pattern) for pattern, _, _ in PATTERNS) - 1
+
+# 快速模式下, 任一应用分值达到该值即视为已识别, 跳过剩余检测
+FAST_MODE_THRESHOLD = 60
+
+def _build_matcher() -> Callable[[str], Iterator[Tuple[int, int]]]:
+    """构建一次遍历匹配全部特征(小写形式)的函数, 产出(结束位置, PATTERNS下标)"""
+    pattern_index = {pattern.lower(): i for i, (pattern, _, _) in enumerate(PATTERNS)}
+    assert len(pattern_index) == len(PATTERNS), 'PATTERNS中存在小写后重复的特征'
+    
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for pattern, i in pattern_index.items():
+            automaton.add_word(pattern, i)
+        automaton.make_automaton()
+        return automaton.iter
+    
+    # 零宽先行断言使每个位置都尝试匹配, 特征之间互相重叠时也不会漏掉;
+    # 同一位置只能命中最长的特征, 以其为前缀的较短特征一并产出
+    prefix_groups = {
+        pattern: tuple((pattern_index[other], len(other)) for other in pattern_index
+                       if pattern.startswith(other))
+        for pattern in pattern_index
+    }
+    alternation = '|'.join(
+        re.escape(pattern) for pattern in sorted(pattern_index, key=len, reverse=True)
+    )
+    master_re = re.compile(f'(?=({alternation}))')
+    
+    def iter_matches(text: str) -> Iterator[Tuple[int, int]]:
+        for match in master_re.finditer(text):
+            begin = match.start(1)
+            for pattern_idx, length in prefix_groups[match.group(1)]:
+                yield begin + length - 1, pattern_idx
+    
+    return iter_matches
+
+_iter_pattern_matches = _build_matcher()
+
+# 抓取超时(连接, 读取), 读取超时针对单次socket读取, 不限制整个下载过程
+_FETCH_TIMEOUT = (3.05, 3)
+# 整个抓取过程的时限(秒), 每收到一块数据检查一次; 最后一次读取最多再等待一个读取超时,
+# 两者之和需小于vercel.json中的maxDuration, 保证持续慢速发送的站点也能及时返回错误响应
+_FETCH_DEADLINE = 6
+
+# 页面读取上限, 检测特征基本都出现在页面前部, 超大页面只读取前512KB
+_MAX_PAGE_BYTES = 512 * 1024
+
+def _build_session() -> requests.Session:
+    """创建带连接池的Session"""
+    session = requests.Session()
+    # 不显式设置Accept-Encoding: Session默认值由urllib3按已安装的解码库生成,
+    # 安装brotli后自动包含br, 且不会声明无法解码的编码
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    })
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+# 模块级Session, 热实例中复用keep-alive连接, 省去重复的TCP/TLS握手
+_SESSION = _build_session()
+
+def _normalize_url(url: str) -> str:
+    """规范化URL, 同时作为结果缓存的键, 命中缓存时无需构造检测器"""
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    return url.rstrip('/')
+
+_MYSHOPIFY_SUFFIX = '.myshopify.com'
+
+# 页面中的Shopify标识, 任一出现即视为Shopify商店
+_SHOPIFY_MARKERS = (b'Shopify', b'cdn.shopify.com', b'shopifycdn.com',
+                    b'shopify-checkout-api-token')
+# 分块查找标识时相邻两段的重叠长度
+_SHOPIFY_MARKER_OVERLAP = max(len(marker) for marker in _SHOPIFY_MARKERS) - 1
+
+_BOLD_CLASSES = frozenset(('bold_options', 'bold_option_set', 'bold_option',
+                           'bold_option_title', 'bold_option_value'))
+
+# Kickflip的mczr class/id特征合并为一个正则, 一次遍历即可, 由lastindex区分命中的分支
+_MCZR_RE = re.compile(rb'(class)="[^"]*mczr[^"]*"|(id)="[^"]*mczr[^"]*"')
+
+class PageSignals:
+    """lxml解析目标(target), 解析时只记录检测所需的标签信息, 不构建DOM树"""
+    
+    def __init__(self):
+        self.script_srcs = []
+        self.iframe_srcs = []
+        self.classes = set()
+        self.title = None
+        self._title_parts = None
+    
+    def start(self, tag, attrib):
+        class_attr = attrib.get('class')
+        if class_attr:
+            self.classes.update(class_attr.split())
+        
+        if tag == 'script':
+            src = attrib.get('src')
+            if src:
+                self.script_srcs.append(src)
+        elif tag == 'iframe':
+            src = attrib.get('src')
+            if src:
+                self.iframe_srcs.append(src)
+        elif tag == 'title' and self.title is None:
+            self._title_parts = []
+    
+    def end(self, tag):
+        if tag == 'title' and self._title_parts is not None:
+            self.title = ''.join(self._title_parts)
+            self._title_parts = None
+    
+    def data(self, data):
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+    
+    def close(self):
+        return self
+    
+    def has_script_src(self, needle: str) -> bool:
+        """是否存在src包含给定字符串的script标签"""
+        return any(needle in src for src in self.script_srcs)
+    
+    def has_iframe_src(self, needle: str) -> bool:
+        """是否存在src包含给定字符串的iframe标签"""
+        return any(needle in src for src in self.iframe_srcs)
 
 class ShopifyAppDetector:
     def __init__(self, url: str):
-        self.url = self._normalize_url(url)
-        self.soup = None
-        self.page_content = None
+        self.url = _normalize_url(url)
+        # 主机名只解析一次, 供店铺判断与店铺名提取复用
+        self._host = urlparse(self.url).hostname or ''
+        self._page_bytes = None
+        # 响应头声明的字符集, 未声明时为None, 交由lxml按meta标签识别
+        self._encoding = None
+        # 特征扫描的累计状态, 支持边下载边扫描
+        self._scores = [0] * len(APP_NAMES)
+        self._matched = set()
+        self._scanned = 0
+        self._confident = False
+        self.is_shopify = None
         self.detected_apps = []
         self.confidence_scores = {}
         
-    def _normalize_url(self, url: str) -> str:
-        """规范化URL"""
-        if not url.startswith(('http://', 'https://')):
-            url = 'https://' + url
-        return url.rstrip('/')
-    
-    def fetch_page(self) -> bool:
-        """获取页面内容"""
+    def fetch_page(self, fast: bool = False, force: bool = False) -> bool:
+        """获取页面内容
+        
+        fast为True时边下载边扫描特征, 已有高置信度应用时不再下载剩余内容;
+        扫描要等页面出现Shopify标识(或force为True)后才开始, 非Shopify页面不做扫描
+        """
+        shopify = force or self._host.endswith(_MYSHOPIFY_SUFFIX)
+        deadline = time.monotonic() + _FETCH_DEADLINE
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(self.url, headers=headers, timeout=10)
-            response.raise_for_status()
+            response = _SESSION.get(self.url, timeout=_FETCH_TIMEOUT, stream=True)
+            try:
+                response.raise_for_status()
+                
+                # 媒体类型不区分大小写
+                content_type = response.headers.get('Content-Type', '').lower()
+                if content_type and 'html' not in content_type:
+                    print(f"Error fetching page: unsupported Content-Type {content_type}")
+                    return False
+                if 'charset' in content_type:
+                    self._encoding = response.encoding
+                
+                # 分块读取, 达到上限后不再下载剩余内容
+                raw = bytearray()
+                for chunk in response.iter_content(65536):
+                    if time.monotonic() > deadline:
+                        print("Error fetching page: exceeded fetch deadline")
+                        return False
+                    searched = len(raw)
+                    raw += chunk
+                    if fast:
+                        if not shopify:
+                            # 只查找新到的部分, 保留重叠以免漏掉跨块的标识
+                            start = max(0, searched - _SHOPIFY_MARKER_OVERLAP)
+                            shopify = any(raw.find(marker, start) != -1
+                                          for marker in _SHOPIFY_MARKERS)
+                        if shopify and self._scan_bytes(raw, fast):
+                            break
+                    if len(raw) >= _MAX_PAGE_BYTES:
+                        break
+            finally:
+                response.close()
             
-            self.page_content = response.text
-            self.soup = BeautifulSoup(self.page_content, 'html.parser')
+            # 区分大小写的检查直接在原始字节上进行, 不做UTF-8解码
+            self._page_bytes = bytes(raw)
             return True
         except Exception as e:
             print(f"Error fetching page: {e}")
             return False
     
+    @cached_property
+    def signals(self) -> PageSignals:
+        """页面标签信息, 首次访问时才解析, 无需DOM检测的请求不产生解析开销"""
+        # 事件式解析原始字节, 只收集检测用到的标签信息
+        try:
+            parser = etree.HTMLParser(target=PageSignals(), encoding=self._encoding)
+        except LookupError:
+            # libxml2不认识响应头中的字符集时, 交由lxml按meta标签识别
+            parser = etree.HTMLParser(target=PageSignals())
+        parser.feed(self._page_bytes)
+        return parser.close()
+    
     def is_shopify_store(self) -> bool:
         """检测是否为Shopify商店"""
-        shopify_indicators = [
-            lambda: self.soup.find('script', src=re.compile(r'cdn\.shopify\.com')),
-            lambda: self.soup.find('script', src=re.compile(r'shopifycdn\.com')),
-            lambda: 'Shopify' in self.page_content,
-            lambda: self.soup.find('meta', {'name': 'shopify-checkout-api-token'}),
-            lambda: '.myshopify.com' in self.url
-        ]
-        
-        return any(indicator() for indicator in shopify_indicators)
-    
-    def detect_zepto(self) -> Tuple[bool, int]:
-        """检测Zepto Product Personalizer"""
-        score = 0
-        checks = {
-            'pplr_custom_cart_track': 30,
-            'zepto-personalizer-container': 25,
-            'shopify://apps/zepto-product-personalizer': 30,
-            '_zepto_design_id': 15
-        }
-        
-        for pattern, points in checks.items():
-            if pattern in self.page_content:
-                score += points
-        
-        return score > 0, score
+        # 均为子串查找, 不触发页面解析
+        return (self._host.endswith(_MYSHOPIFY_SUFFIX)
+                or any(marker in self._page_bytes for marker in _SHOPIFY_MARKERS))
     
     def detect_bold_options(self) -> Tuple[bool, int]:
         """检测Bold Options"""
         score = 0
         
-        # CSS类检测
-        bold_classes = ['bold_options', 'bold_option_set', 'bold_option', 
-                       'bold_option_title', 'bold_option_value']
-        for class_name in bold_classes:
-            if self.soup.find(class_=class_name):
-                score += 15
+        # CSS类检测, 每个命中的class计15分
+        score += 15 * len(_BOLD_CLASSES.intersection(self.signals.classes))
         
         # Script检测
-        if self.soup.find('script', src=re.compile(r'boldapps\.net')):
+        if self.signals.has_script_src('boldapps.net'):
             score += 30
         
         # JS对象检测
-        if 'BoldOptions' in self.page_content or 'window.Bold' in self.page_content:
+        if b'BoldOptions' in self._page_bytes or b'window.Bold' in self._page_bytes:
             score += 25
         
         return score > 0, score
@@ -91,275 +371,92 @@ class ShopifyAppDetector:
         """检测Kickflip"""
         score = 0
         
-        # 检测mczr相关元素
-        mczr_patterns = [
-            r'class="[^"]*mczr[^"]*"',
-            r'id="[^"]*mczr[^"]*"',
-            r'data-mczr=',
-            '#mczr-modal',
-            'mczrAddToCart'
-        ]
-        
-        for pattern in mczr_patterns:
-            if re.search(pattern, self.page_content):
-                score += 15
+        # 检测mczr相关元素 (纯字符串特征见PATTERNS), 每个分支只计分一次
+        # 先用子串查找排除不含mczr的页面, 绝大多数页面无需执行正则
+        if b'mczr' in self._page_bytes:
+            branches = set()
+            for match in _MCZR_RE.finditer(self._page_bytes):
+                branches.add(match.lastindex)
+                if len(branches) == _MCZR_RE.groups:
+                    break
+            score += 15 * len(branches)
         
         # 检测iframe
-        if self.soup.find('iframe', src=re.compile(r'gokickflip\.com')):
+        if self.signals.has_iframe_src('gokickflip.com'):
             score += 40
         
         return score > 0, score
     
-    def detect_customily(self) -> Tuple[bool, int]:
-        """检测Customily"""
-        score = 0
-        
-        patterns = {
-            'window.engraver': 35,
-            'engraver.init': 30,
-            'customily.com': 25,
-            'preview-canvas': 10
-        }
-        
-        for pattern, points in patterns.items():
-            if pattern in self.page_content:
-                score += points
-        
-        return score > 0, score
-    
-    def detect_shoppad_infinite_options(self) -> Tuple[bool, int]:
-        """检测Shoppad Infinite Options"""
-        score = 0
-        
-        patterns = {
-            'Shoppad.apps.infiniteoptions': 40,
-            'infiniteoptions-container': 30,
-            'infinite_options': 20,
-            'window.Shoppad': 10
-        }
-        
-        for pattern, points in patterns.items():
-            if pattern in self.page_content:
-                score += points
-        
-        return score > 0, score
-    
-    def detect_hulk(self) -> Tuple[bool, int]:
-        """检测Hulk Product Options"""
-        score = 0
-        
-        patterns = {
-            'HulkProductOptions': 35,
-            'hulk-product-options': 30,
-            'hulkapps.com': 25,
-            'hulk_po': 10
-        }
-        
-        for pattern, points in patterns.items():
-            if pattern in self.page_content:
-                score += points
-        
-        return score > 0, score
-    
-    def detect_tepo(self) -> Tuple[bool, int]:
-        """检测Tepo Product Options"""
-        score = 0
-        
-        patterns = {
-            'tepo-options': 30,
-            'TepoOptions': 30,
-            'class="tepo-': 25,
-            'window.tepo': 15
-        }
-        
-        for pattern, points in patterns.items():
-            if pattern in self.page_content:
-                score += points
-        
-        return score > 0, score
-    
-    def detect_apo(self) -> Tuple[bool, int]:
-        """检测APO (Advanced Product Options)"""
-        score = 0
-        
-        patterns = {
-            'mwProductOptionsObjects': 40,
-            'mw-product-options': 30,
-            'mageworx': 20,
-            '_mw_option_relation': 10
-        }
-        
-        for pattern, points in patterns.items():
-            if pattern in self.page_content:
-                score += points
-        
-        return score > 0, score
-    
-    def detect_teeinblue(self) -> Tuple[bool, int]:
-        """检测Teeinblue"""
-        score = 0
-        
-        patterns = {
-            'Teeinblue': 30,
-            'teeinblue-form': 30,
-            'teeinblue.com': 25,
-            'window.TIB': 15
-        }
-        
-        for pattern, points in patterns.items():
-            if pattern in self.page_content:
-                score += points
-        
-        return score > 0, score
-    
-    def detect_zakeke(self) -> Tuple[bool, int]:
-        """检测Zakeke"""
-        score = 0
-        
-        patterns = {
-            'zakekeDesigner': 35,
-            'zakeke-container': 30,
-            'zakeke.com': 25,
-            'zakeke-button': 10
-        }
-        
-        for pattern, points in patterns.items():
-            if pattern in self.page_content:
-                score += points
-        
-        return score > 0, score
+    # 依赖DOM或正则的检测: (APP_NAMES下标, 检测方法), 类定义时构建一次
+    DOM_DETECTORS: ClassVar[Tuple[Tuple[int, Callable], ...]] = (
+        (_APP_INDEX['Bold Product Options'], detect_bold_options),
+        (_APP_INDEX['Kickflip'], detect_kickflip)
+    )
     
-    def detect_sc_options(self) -> Tuple[bool, int]:
-        """检测SC Product Options"""
-        score = 0
-        
-        patterns = {
-            'SCProductOptions': 35,
-            'sc-product-options': 30,
-            'data-sc-option': 20
-        }
-        
-        for pattern, points in patterns.items():
-            if pattern in self.page_content:
-                score += points
-        
-        return score > 0, score
+    def _scan_bytes(self, buf, fast: bool) -> bool:
+        """扫描buf中尚未扫描的部分, 累计分值; 快速模式下已有高置信度应用时返回True"""
+        if self._confident or self._scanned >= len(buf):
+            return self._confident
+        
+        # 回退最长特征长度-1个字节, 跨越上次扫描边界的特征也能匹配到
+        start = max(0, self._scanned - _PATTERN_OVERLAP)
+        # 特征均为ASCII, 按latin-1逐字节转为str即可,
+        # 且结果保持每字符1字节的紧凑存储; text与buf[start:]逐字节对齐
+        text = buf[start:].lower().decode('latin-1')
+        self._scanned = len(buf)
+        
+        scores = self._scores
+        matched = self._matched
+        # 同一特征出现多次只计分一次
+        for end, pattern_idx in _iter_pattern_matches(text):
+            if pattern_idx not in matched:
+                exact = _PATTERN_EXACT[pattern_idx]
+                if exact is not None:
+                    stop = start + end + 1
+                    if buf[stop - len(exact):stop] != exact:
+                        continue
+                matched.add(pattern_idx)
+                app_idx = _PATTERN_APPS[pattern_idx]
+                scores[app_idx] += _PATTERN_POINTS[pattern_idx]
+                if fast and scores[app_idx] >= FAST_MODE_THRESHOLD:
+                    self._confident = True
+                    break
+        
+        return self._confident
     
-    def detect_lpo(self) -> Tuple[bool, int]:
-        """检测LPO (Live Product Options)"""
-        score = 0
-        
-        patterns = {
-            'liveProductOptions': 35,
-            'lpo-options': 30,
-            'cloudlift': 25,
-            'window.LPO': 10
-        }
-        
-        for pattern, points in patterns.items():
-            if pattern in self.page_content:
-                score += points
-        
-        return score > 0, score
-    
-    def detect_avis(self) -> Tuple[bool, int]:
-        """检测Avis Product Options"""
-        score = 0
-        
-        patterns = {
-            'AvisOptions': 35,
-            'avis-options': 30,
-            'avisplus-product-options': 25,
-            'data-avis-option': 10
-        }
-        
-        for pattern, points in patterns.items():
-            if pattern in self.page_content:
-                score += points
-        
-        return score > 0, score
-    
-    def detect_globo(self) -> Tuple[bool, int]:
-        """检测Globo Product Options"""
-        score = 0
-        
-        patterns = {
-            'GloboProductOptions': 35,
-            'globo-options': 30,
-            'globo.io': 25,
-            'globosoftware': 15
-        }
-        
-        for pattern, points in patterns.items():
-            if pattern in self.page_content:
-                score += points
-        
-        return score > 0, score
-    
-    def detect_easify(self) -> Tuple[bool, int]:
-        """检测easify Product Options"""
-        score = 0
-        
-        patterns = {
-            'EasifyOptions': 35,
-            'easify-options': 30,
-            'data-easify': 20,
-            'easify_product_options': 15
-        }
-        
-        for pattern, points in patterns.items():
-            if pattern in self.page_content:
-                score += points
+    def scan_patterns(self, fast: bool = False) -> List[int]:
+        """遍历页面, 按APP_NAMES下标累计PATTERNS中各应用的分值
         
-        return score > 0, score
+        fast为True时, 任一应用分值达到FAST_MODE_THRESHOLD即停止遍历
+        """
+        self._scan_bytes(self._page_bytes, fast)
+        return self._scores
     
-    def detect_shopaw(self) -> Tuple[bool, int]:
-        """检测Shopaw Product Options"""
-        score = 0
-        
-        patterns = {
-            'ShopawOptions': 35,
-            'shopaw-options': 30,
-            'shopaw-product-builder': 25,
-            'data-shopaw': 10
-        }
+    def run_detection(self, fast: bool = False, force: bool = False):
+        """运行所有检测
         
-        for pattern, points in patterns.items():
-            if pattern in self.page_content:
-                score += points
-        
-        return score > 0, score
-    
-    def run_detection(self):
-        """运行所有检测"""
-        if not self.fetch_page():
+        fast为True时, 找到高置信度应用后跳过剩余检测, 其余应用的分值可能不完整;
+        force为True时, 即使页面不像Shopify商店也执行完整检测
+        """
+        if not self.fetch_page(fast, force):
             return False
         
-        if not self.is_shopify_store():
-            print("Warning: This may not be a Shopify store")
+        # 检测的均为Shopify应用, 非Shopify页面直接返回空结果
+        self.is_shopify = self.is_shopify_store()
+        if not self.is_shopify and not force:
+            return True
         
-        detectors = {
-            'Zepto Product Personalizer': self.detect_zepto,
-            'Bold Product Options': self.detect_bold_options,
-            'Kickflip': self.detect_kickflip,
-            'Customily': self.detect_customily,
-            'Shoppad Infinite Options': self.detect_shoppad_infinite_options,
-            'Hulk Product Options': self.detect_hulk,
-            'Tepo Product Options': self.detect_tepo,
-            'APO (Advanced Product Options)': self.detect_apo,
-            'Teeinblue': self.detect_teeinblue,
-            'Zakeke': self.detect_zakeke,
-            'SC Product Options': self.detect_sc_options,
-            'LPO (Live Product Options)': self.detect_lpo,
-            'Avis Product Options': self.detect_avis,
-            'Globo Product Options': self.detect_globo,
-            'Easify Product Options': self.detect_easify,
-            'Shopaw Product Options': self.detect_shopaw
-        }
+        scores = self.scan_patterns(fast)
         
-        for app_name, detector in detectors.items():
-            detected, score = detector()
+        for app_idx, detector in self.DOM_DETECTORS:
+            if fast and max(scores) >= FAST_MODE_THRESHOLD:
+                break
+            detected, score = detector(self)
             if detected:
+                scores[app_idx] += score
+        
+        for app_name, score in zip(APP_NAMES, scores):
+            if score > 0:
                 self.detected_apps.append(app_name)
                 self.confidence_scores[app_name] = score
         
@@ -369,18 +466,105 @@ class ShopifyAppDetector:
         """提取店铺名称"""
         try:
             # 从URL提取
-            if '.myshopify.com' in self.url:
-                return self.url.split('//')[1].split('.myshopify.com')[0]
+            if self._host.endswith(_MYSHOPIFY_SUFFIX):
+                return self._host[:-len(_MYSHOPIFY_SUFFIX)]
             
             # 从页面title提取
-            title_tag = self.soup.find('title')
-            if title_tag:
-                return title_tag.get_text().strip()
+            if self.signals.title is not None:
+                return self.signals.title.strip()
             
             return None
         except:
             return None
 
+# 检测结果缓存: (规范化URL, fast, force) -> (写入时间, 结果), 在热实例的多次调用间共享
+# 按LRU淘汰, 最多保留_RESULT_CACHE_MAXSIZE条
+_RESULT_CACHE: "OrderedDict[Tuple[str, bool, bool], Tuple[float, dict]]" = OrderedDict()
+_RESULT_CACHE_TTL = 300
+_RESULT_CACHE_MAXSIZE = 1024
+_RESULT_CACHE_LOCK = threading.Lock()
+_RESULT_CACHE_CONTROL = f'public, max-age={_RESULT_CACHE_TTL}'
+
+def _get_cached_result(key: Tuple[str, bool, bool]):
+    """读取未过期的缓存结果"""
+    with _RESULT_CACHE_LOCK:
+        hit = _RESULT_CACHE.get(key)
+        if hit is None:
+            return None
+        if time.monotonic() - hit[0] >= _RESULT_CACHE_TTL:
+            del _RESULT_CACHE[key]
+            return None
+        _RESULT_CACHE.move_to_end(key)
+        return hit[1]
+
+def _set_cached_result(key: Tuple[str, bool, bool], result: dict):
+    """写入缓存结果"""
+    with _RESULT_CACHE_LOCK:
+        _RESULT_CACHE[key] = (time.monotonic(), result)
+        _RESULT_CACHE.move_to_end(key)
+        if len(_RESULT_CACHE) > _RESULT_CACHE_MAXSIZE:
+            _RESULT_CACHE.popitem(last=False)
+
+def detect_for_url(url: str, fast: bool = False, force: bool = False):
+    """检测指定URL并返回结果, 页面获取失败时返回None
+    
+    同一店铺短时间内重复检测直接返回缓存结果, 不再抓取页面
+    """
+    normalized_url = _normalize_url(url)
+    cache_key = (normalized_url, fast, force)
+    
+    cached = _get_cached_result(cache_key)
+    if cached is not None:
+        return dict(cached, url=url)
+    
+    # 仅在未命中缓存时构造检测器并解析主机名
+    detector = ShopifyAppDetector(normalized_url)
+    if not detector.run_detection(fast, force):
+        return None
+    
+    result = {
+        "url": url,
+        "is_shopify": detector.is_shopify,
+        "detected_apps": detector.detected_apps,
+        "confidence_scores": detector.confidence_scores,
+        "shop_name": detector.get_shop_name(),
+        "timestamp": datetime.now()
+    }
+    _set_cached_result(cache_key, result)
+    return result
+
+# 响应体小于该值时不压缩, gzip头部开销会抵消收益
+_GZIP_MIN_BYTES = 1024
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """按Accept-Encoding判断客户端是否接受gzip, q=0表示明确拒绝"""
+    accepted = None
+    for token in accept_encoding.split(','):
+        coding, _, params = token.partition(';')
+        coding = coding.strip().lower()
+        if coding not in ('gzip', '*'):
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        # 显式列出的gzip优先于通配符*
+        if coding == 'gzip':
+            return q > 0
+        accepted = q > 0
+    return bool(accepted)
+
+# 所有JSON响应共用的固定响应头
+_JSON_RESPONSE_HEADERS = (
+    'Content-Type: application/json; charset=utf-8\r\n'
+    'Access-Control-Allow-Origin: *\r\n'
+    'Vary: Accept-Encoding\r\n'
+)
+
 class handler(BaseHTTPRequestHandler):
     def do_OPTIONS(self):
         # 处理预检请求
@@ -404,24 +588,23 @@ class handler(BaseHTTPRequestHandler):
                 
             # 验证URL格式
             url = data['url'].strip()
-            parsed_url = urlparse(url)
-            if not parsed_url.scheme or not parsed_url.netloc:
+            if not url.startswith(('http://', 'https://')):
+                self.send_error_response(400, "Invalid URL format")
+                return
+            rest = url.split('://', 1)[1]
+            if rest[:1] in ('', '/', '?', '#'):
                 self.send_error_response(400, "Invalid URL format")
                 return
             
+            # mode为fast时找到高置信度应用即返回, 默认完整检测
+            fast = data.get('mode') == 'fast'
+            # force为true时, 非Shopify页面也执行检测
+            force = data.get('force') is True
+            
             # 使用Shopify检测器
-            detector = ShopifyAppDetector(url)
+            result = detect_for_url(url, fast, force)
             
-            if detector.run_detection():
-                # 构建返回结果
-                result = {
-                    "url": url,
-                    "detected_apps": detector.detected_apps,
-                    "confidence_scores": detector.confidence_scores,
-                    "shop_name": detector.get_shop_name(),
-                    "timestamp": datetime.now().isoformat()
-                }
-                
+            if result is not None:
                 # 返回成功响应
                 self.send_success_response(result)
             else:
@@ -440,21 +623,15 @@ class handler(BaseHTTPRequestHandler):
             self.send_error_response(500, f"Server error: {str(e)}")
     
     def send_success_response(self, data):
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json; charset=utf-8')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
         response = {
             "success": True,
             "data": data
         }
-        self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8'))
+        self.send_json_response(200, response, {
+            'Cache-Control': _RESULT_CACHE_CONTROL
+        })
     
     def send_error_response(self, code, message):
-        self.send_response(code)
-        self.send_header('Content-type', 'application/json; charset=utf-8')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
         response = {
             "success": False,
             "error": {
@@ -462,4 +639,30 @@ class handler(BaseHTTPRequestHandler):
                 "message": message
             }
         }
-        self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8'))
+        self.send_json_response(code, response)
+    
+    def send_json_response(self, code, response, extra_headers=None):
+        """序列化并发送JSON响应, 客户端支持时对较大的响应体做gzip压缩
+        
+        状态行、响应头与响应体拼接后一次写出, 不经过send_header逐行格式化
+        """
+        body = orjson.dumps(response)
+        
+        head = [
+            f'{self.protocol_version} {code} {self.responses[code][0]}\r\n'
+            f'Date: {self.date_time_string()}\r\n',
+            _JSON_RESPONSE_HEADERS
+        ]
+        for key, value in (extra_headers or {}).items():
+            head.append(f'{key}: {value}\r\n')
+        
+        if (len(body) >= _GZIP_MIN_BYTES
+                and _accepts_gzip(self.headers.get('Accept-Encoding', ''))):
+            # 压缩级别1: CPU开销最低, 对JSON仍有可观的压缩率
+            body = gzip.compress(body, compresslevel=1)
+            head.append('Content-Encoding: gzip\r\n')
+        
+        head.append(f'Content-Length: {len(body)}\r\n\r\n')
+        
+        self.log_request(code)
+        self.wfile.write(''.join(head).encode('latin-1') + body)